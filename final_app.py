@@ -1,31 +1,155 @@
 import dash
 from dash import Dash, dcc, html, Input, Output, State
-import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from urllib.parse import urljoin
+from html import unescape
+from html.parser import HTMLParser
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from cachetools import TTLCache, cached
+import functools
+import hashlib
 import io
+import json
+import os
+import re
+import tempfile
+import time
 
 BASE_URL = "https://data.ovh.pandonia-global-network.org/"
 
+# Shared HTTP session so directory listings and file downloads reuse
+# keep-alive connections instead of paying a TCP + TLS handshake per request
+SESSION = requests.Session()
+adapter = HTTPAdapter(
+    pool_connections=8,
+    pool_maxsize=32,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(502, 503, 504)),
+)
+SESSION.mount("https://", adapter)
+SESSION.mount("http://", adapter)
+SESSION.headers.update({"Accept-Encoding": "gzip, deflate"})
+REQUEST_TIMEOUT = (3, 30)  # (connect, read) seconds
+FILE_TIMEOUT = (5, 120)  # L2 files can be several MB
+# Parquet snapshots of parsed files, pruned to the size and age limits below
+CACHE_DIR = os.path.abspath(
+    os.environ.get("L2_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "_cache"))
+)
+CACHE_MAX_BYTES = int(os.environ.get("L2_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+CACHE_MAX_AGE = 7 * 24 * 3600  # Seconds since a snapshot was last written or read
+CACHE_TMP_MAX_AGE = 3600  # Temporary files older than this were left by a failed write
+MAX_CHART_POINTS = 2000  # More points than this cannot be told apart on screen
+
+PREFETCH_LIMIT = 16  # Max number of child directories listed ahead of time
+
+# Directory listings change at most every few minutes on the server, so
+# repeated navigations are served from memory for a short while
+_LIST_CACHE = TTLCache(maxsize=512, ttl=300)
+_LIST_LOCK = Lock()
+_prefetch_pool = ThreadPoolExecutor(max_workers=8)
+# Futures of prefetches that are queued or running, keyed by URL. The cache
+# only sees finished fetches, so callers wait on running ones instead of
+# fetching again, and cancel queued ones to fetch directly
+_pending_prefetches = {}
+_PENDING_LOCK = Lock()
+
+# Entry links of a Caddy autoindex page, e.g. <a href="./Boulder/">
+_HREF_RE = re.compile(rb'href="\./(?!\.\.)([^"?#]+?)/?"')
+# Links on the listing that are not data directories or files
+_BAD_PREFIXES = ("../", "javascript", "operationfiles")
+_BAD_PREFIXES_BYTES = tuple(prefix.encode() for prefix in _BAD_PREFIXES)
+
+
+class _LinkParser(HTMLParser):
+    """Collects the href of every <a> tag, for listings the regex does not match."""
+
+    def __init__(self):
+        super().__init__()
+        self.hrefs = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "a":
+            href = dict(attrs).get("href")
+            if href:
+                self.hrefs.append(href)
+
+
+@cached(_LIST_CACHE, lock=_LIST_LOCK)
+def fetch_items(base_url):
+    """
+    Fetch and parse the entries of a directory listing. Raises on HTTP errors.
+    """
+    response = SESSION.get(base_url, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    items = [
+        unescape(m.decode())
+        for m in _HREF_RE.findall(response.content)
+        if not m.startswith(_BAD_PREFIXES_BYTES)
+    ]
+    if items:
+        return items
+
+    # Fall back to a full HTML parse for pages whose markup differs
+    parser = _LinkParser()
+    parser.feed(response.text)
+    for href in parser.hrefs:
+        if href[:2] == "./" and not href[2:].startswith(_BAD_PREFIXES):
+            items.append(href[2:].rstrip("/"))  # Drop the literal "./" prefix
+    return items
+
+
 def list_items(base_url):
+    with _PENDING_LOCK:
+        pending = _pending_prefetches.get(base_url)
+    if pending is not None:
+        if pending.cancel():
+            # Still queued behind other prefetches; fetch now instead of waiting
+            with _PENDING_LOCK:
+                if _pending_prefetches.get(base_url) is pending:
+                    del _pending_prefetches[base_url]
+        else:
+            pending.result()  # Let the running prefetch fill _LIST_CACHE
     try:
-        response = requests.get(base_url)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
-        items = []
-        for link in soup.find_all("a", href=True):
-            href = link["href"]
-            if href.startswith("./") and not href.startswith(("../", "../../", "javascript", "operationfiles")):
-                items.append(href.lstrip("./").rstrip("/"))  # Clean up the href
-        return items
+        return fetch_items(base_url)
     except Exception as e:
         print(f"Error listing items: {e}")
         return []
 
-# Initialize Dash app
-app = Dash(__name__)
+
+def _prefetch_listing(url):
+    try:
+        fetch_items(url)
+    except Exception as e:
+        print(f"Error prefetching {url}: {e}")
+    finally:
+        with _PENDING_LOCK:
+            _pending_prefetches.pop(url, None)
+
+
+def prefetch_listings(urls):
+    """
+    List the given directories concurrently in the background so that the
+    next dropdown selection is served from _LIST_CACHE.
+    """
+    for url in urls[:PREFETCH_LIMIT]:
+        # Submitting under the lock means the task cannot unregister itself first
+        with _PENDING_LOCK:
+            if url not in _pending_prefetches:
+                _pending_prefetches[url] = _prefetch_pool.submit(_prefetch_listing, url)
+
+# Serialize figures with orjson, which encodes NumPy arrays natively
+pio.json.config.default_engine = "orjson"
+
+# Initialize Dash app; compress=True gzips callback responses via Flask-Compress
+app = Dash(__name__, compress=True)
 server = app.server
 app.title = "Data Dashboard"
 
@@ -79,17 +203,24 @@ app.layout = html.Div([
         dcc.Dropdown(id="line-chart-column-dropdown2"),
     ], style={"width": "40%", "margin": "10px auto"}),
     dcc.Graph(id="line-chart2"),
+
+    # URL of the file loaded in this browser session; the parsed DataFrame
+    # itself stays in the server-side cache of load_file
+    dcc.Store(id="file-store", storage_type="memory"),
 ])
 
 # Callback to update the device dropdown based on selected location
 @app.callback(
     Output("device-dropdown", "options"),
-    Input("location-dropdown", "value")
+    Input("location-dropdown", "value"),
+    prevent_initial_call=True,
 )
 def update_device_dropdown(selected_location):
     if selected_location:
         location_url = urljoin(BASE_URL, selected_location + "/")
         devices = list_items(location_url)
+        # Warm the L2 listings of each device while the user is still choosing
+        prefetch_listings([urljoin(BASE_URL, f"{selected_location}/{device}/L2/") for device in devices])
         return [{"label": device, "value": device} for device in devices]
     return []
 
@@ -97,7 +228,8 @@ def update_device_dropdown(selected_location):
 @app.callback(
     Output("file-dropdown", "options"),
     [Input("location-dropdown", "value"),
-     Input("device-dropdown", "value")]
+     Input("device-dropdown", "value")],
+    prevent_initial_call=True,
 )
 def update_file_dropdown(selected_location, selected_device):
     if selected_location and selected_device:
@@ -107,95 +239,478 @@ def update_file_dropdown(selected_location, selected_device):
     return []
 
 
-def extract_column_names(file_content):
+# Column descriptions in the header, e.g. "Column 1: UT date and time for measurement center, ..."
+# Only spaces and tabs are skipped so an empty description still takes its slot
+_COL_RE = re.compile(r"^[ \t]*Column[ \t]+\d+:[ \t]*([^,\r\n]*)", re.MULTILINE)
+
+
+@functools.lru_cache(maxsize=64)
+def extract_column_names(header_bytes):
     """
-    Extract column names from the provided file content, ensuring unique names.
+    Extract column names from the header of a file, ensuring unique names.
+    Files from the same instrument share headers, so results are memoized.
     """
     column_names = []
     seen_names = {}
-    for line in file_content:
-        if line.strip().startswith("Column") and not line.strip().startswith("From"):
-            # Extract column name from description (e.g., "Column 1: UT date and time")
-            parts = line.split(":", 1)
-            if len(parts) > 1:
-                base_name = parts[1].strip().split(",")[0]  # Take text before the comma
-                # Make the name unique
-                if base_name in seen_names:
-                    seen_names[base_name] += 1
-                    unique_name = f"{base_name}_{seen_names[base_name]}"
-                else:
-                    seen_names[base_name] = 0
-                    unique_name = base_name
-                column_names.append(unique_name)
-    return column_names
-
-
-timestamp_column = None  # Global variable to store the timestamp column name
+    for match in _COL_RE.finditer(header_bytes.decode("utf-8", errors="ignore")):
+        base_name = match.group(1).strip()
+        # Make the name unique
+        if base_name in seen_names:
+            seen_names[base_name] += 1
+            unique_name = f"{base_name}_{seen_names[base_name]}"
+        else:
+            seen_names[base_name] = 0
+            unique_name = base_name
+        column_names.append(unique_name)
+    return tuple(column_names)
+
+
+# Parsed files keyed by URL, so re-selecting a file skips download and parsing
+_FILE_CACHE = TTLCache(maxsize=16, ttl=600)
+_FILE_LOCK = Lock()
+
+
+class InvalidFileError(Exception):
+    """Raised when a downloaded file has no usable data section."""
+
+
+WHITESPACE_SAMPLE_BYTES = 1 << 16
+
+
+def _single_spaced(data):
+    """
+    Whether the data section looks separated by single spaces, judged from
+    its first block. Messier rows later on still surface as skipped rows or
+    conversion errors in pyarrow, which fall back to pandas.
+    """
+    sample = bytes(data[:WHITESPACE_SAMPLE_BYTES])
+    return not (b"  " in sample or b"\t" in sample or b" \n" in sample or b"\n " in sample or sample[:1] == b" ")
+
+
+# Flag and index columns only take a handful of distinct values
+LOW_CARDINALITY_KEYWORDS = ("quality flag", "processing type index", "calibration file version", "filterwheel")
+
+
+# Columns whose values need float64, e.g. 8766.0000115 days steps by ~84 s in float32
+FLOAT64_KEYWORDS = ("fractional day",)
+FLOAT32_DIGITS = 7  # Significant decimal digits float32 holds
+FLOAT32_MAX = float(np.finfo(np.float32).max)
+
+
+def _significant_digits(token):
+    mantissa = token.lower().split(b"e")[0].lstrip(b"+-")
+    return len(mantissa.replace(b".", b"").lstrip(b"0"))
+
+
+def float64_columns(column_names, first_row):
+    """
+    Names of the data columns that must stay float64: known high precision
+    columns and those whose value in the first data row has more significant
+    digits than float32 holds.
+    """
+    wide = {name for name in column_names if any(keyword in name.lower() for keyword in FLOAT64_KEYWORDS)}
+    for name, token in zip(column_names, first_row.split()):
+        if _significant_digits(token) > FLOAT32_DIGITS:
+            wide.add(name)
+    return wide
+
+
+def _compact_dtypes(df, float64_columns):
+    """
+    Downcast float64 columns to float32 unless they are in float64_columns or
+    hold values beyond the float32 range, and store low-cardinality columns
+    as categories.
+    """
+    for col in df.select_dtypes("float64").columns:
+        if col in float64_columns:
+            continue
+        # Fill values such as -9e99 ("retrieval not successful") overflow float32
+        if (df[col].abs() > FLOAT32_MAX).any():
+            continue
+        df[col] = df[col].astype("float32")
+    for col in df.columns:
+        if any(keyword in col.lower() for keyword in LOW_CARDINALITY_KEYWORDS):
+            df[col] = df[col].astype("category")
+    return df
+
+
+def read_data_section(data, column_names, timestamp_column, first_row):
+    """
+    Parse the whitespace separated data rows of an L2 file into a DataFrame,
+    with the timestamp kept as a string. Data columns are read as float64 and
+    narrowed to float32 unless they need the precision or range; values that
+    are not numbers become NaN.
+    """
+    field_count = len(first_row.split())
+    wide_columns = float64_columns(column_names, first_row)
+    # pyarrow only splits on single spaces; collapsing whitespace runs in
+    # Python first costs more than pandas' own whitespace parsing
+    if _single_spaced(data):
+        try:
+            # pyarrow parses on multiple threads with a fixed schema, but only
+            # accepts rows with exactly as many fields as names
+            read_names = column_names[:field_count]
+            column_types = {name: pa.float64() for name in read_names}
+            column_types[timestamp_column] = pa.string()
+            skipped_rows = []
+
+            def skip_row(row):
+                skipped_rows.append(row.number)
+                return "skip"
+
+            table = pacsv.read_csv(
+                pa.BufferReader(data),
+                read_options=pacsv.ReadOptions(column_names=read_names, block_size=1 << 20),
+                parse_options=pacsv.ParseOptions(delimiter=" ", invalid_row_handler=skip_row),
+                convert_options=pacsv.ConvertOptions(column_types=column_types, null_values=["--"]),
+            )
+            if not skipped_rows:
+                df = table.to_pandas(types_mapper={pa.string(): pd.StringDtype()}.get)
+                # Header columns missing from the data rows are kept, empty
+                for name in column_names[field_count:]:
+                    df[name] = pd.Series(np.nan, index=df.index, dtype="float32")
+                return _compact_dtypes(df, wide_columns)
+            # pandas pads short rows with NaN and only drops long ones
+            print(f"Falling back to pandas parser: {len(skipped_rows)} rows with a different field count")
+        except pa.ArrowInvalid as e:
+            print(f"Falling back to pandas parser: {e}")
+
+    # Reached for files pyarrow cannot read, so let pandas infer the types
+    df = pd.read_csv(
+        io.BytesIO(data),
+        sep=r"\s+",
+        engine="c",
+        names=column_names,
+        dtype={timestamp_column: "string"},
+        na_values=["--"],
+        on_bad_lines="skip",  # Skip problematic lines
+        low_memory=False,
+    )
+    # Coerce stray non-numeric tokens to NaN instead of failing the whole file
+    for col in df.columns:
+        if col != timestamp_column and df[col].dtype != "float64":
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("float64")
+    return _compact_dtypes(df, wide_columns)
+
+
+TIMESTAMP_FORMAT = "%Y%m%dT%H%M%S.%fZ"  # e.g. 20240101T120000.5Z
+
+
+def _fixed_width_timestamps(values):
+    """
+    Convert timestamp strings of one fixed width to datetime64[ns] by slicing
+    their digits as whole NumPy arrays. Returns None if any value is irregular.
+    """
+    try:
+        raw = np.array(values.to_numpy(dtype=object, na_value=""), dtype="S")
+    except UnicodeEncodeError:
+        return None
+    width = raw.dtype.itemsize
+    if width < 18 or width > 26:  # One to nine fractional digits
+        return None
+
+    chars = raw.view(np.uint8).reshape(-1, width)
+    digits = chars.astype(np.int64) - ord("0")
+    digit_columns = digits[:, np.r_[0:8, 9:15, 16:width - 1]]
+    if not (
+        (chars[:, 8] == ord("T")).all()
+        and (chars[:, 15] == ord(".")).all()
+        and (chars[:, -1] == ord("Z")).all()  # Also rules out shorter rows, which are zero padded
+        and ((digit_columns >= 0) & (digit_columns <= 9)).all()
+    ):
+        return None
+
+    def number(start, stop):
+        return digits[:, start:stop] @ (10 ** np.arange(stop - start - 1, -1, -1))
+
+    year, month, day = number(0, 4), number(4, 6), number(6, 8)
+    hour, minute, second = number(9, 11), number(11, 13), number(13, 15)
+    if not ((month >= 1) & (month <= 12) & (day >= 1) & (hour < 24) & (minute < 60) & (second < 61)).all():
+        return None
+    months = ((year - 1970) * 12 + month - 1).astype("datetime64[M]")
+    days = months.astype("datetime64[D]") + (day - 1).astype("timedelta64[D]")
+    if (days.astype("datetime64[M]") != months).any():  # Day past the end of its month
+        return None
+
+    seconds = hour * 3600 + minute * 60 + second
+    fraction_ns = number(16, width - 1) * 10 ** (9 - (width - 17))
+    return days.astype("datetime64[ns]") + (seconds * 10**9 + fraction_ns).astype("timedelta64[ns]")
+
+
+def parse_timestamps(values):
+    """
+    Convert timestamp strings to datetime64[ns]. Timestamps in a file share one
+    fixed width, so they are converted arithmetically; anything irregular
+    goes through pandas with unparseable values set to NaT.
+    """
+    timestamps = _fixed_width_timestamps(values)
+    if timestamps is None:
+        timestamps = pd.to_datetime(values, format=TIMESTAMP_FORMAT, errors="coerce", cache=True)
+    return timestamps
+
+
+def find_timestamp_column(column_names):
+    possible_timestamp_columns = ["Timestamp", "UT date and time for measurement center"]
+    return next((col for col in column_names if col in possible_timestamp_columns), None)
+
+
+def _disk_cache_paths(file_url):
+    cache_key = hashlib.sha1(file_url.encode()).hexdigest()
+    base = os.path.join(CACHE_DIR, cache_key)
+    return base + ".parquet", base + ".meta.json"
+
+
+def _read_cache_meta(meta_path):
+    try:
+        with open(meta_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _snapshot_id(path):
+    stat = os.stat(path)
+    return [stat.st_ino, stat.st_size]
+
+
+def _snapshot_matches(meta, parquet_path):
+    """
+    Whether the validators in meta were written for the snapshot currently at
+    parquet_path, rather than for one another worker replaced it with.
+    """
+    try:
+        return meta.get("snapshot") == _snapshot_id(parquet_path)
+    except OSError:
+        return False
+
+
+def _read_disk_cache(parquet_path, meta_path):
+    """
+    Load a Parquet snapshot, or delete it and return None if it is missing,
+    corrupt or not indexed by time.
+    """
+    try:
+        # Float categories come back as plain float32 from Parquet
+        df = pd.read_parquet(parquet_path)
+        # Columns still float64 in a snapshot were kept wide on purpose
+        df = _compact_dtypes(df, set(df.select_dtypes("float64").columns))
+        if not isinstance(df.index, pd.DatetimeIndex):
+            raise ValueError("snapshot is not indexed by timestamp")
+        os.utime(parquet_path)  # Mark as recently used for pruning
+        return df
+    except Exception as e:
+        print(f"Discarding cached snapshot {parquet_path}: {e}")
+        for path in (parquet_path, meta_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        return None
+
+
+def _prune_disk_cache():
+    """
+    Delete snapshots not used within CACHE_MAX_AGE, then the least recently
+    used ones until the cache fits in CACHE_MAX_BYTES.
+    """
+    now = time.time()
+    try:
+        snapshots = []
+        for entry in os.scandir(CACHE_DIR):
+            if entry.name.endswith(".parquet"):
+                stat = entry.stat()
+                snapshots.append((stat.st_mtime, stat.st_size, entry.path))
+            elif entry.name.endswith(".tmp") and now - entry.stat().st_mtime > CACHE_TMP_MAX_AGE:
+                os.remove(entry.path)
+    except OSError:
+        return
+    snapshots.sort(reverse=True)  # Most recently used first
+
+    total = 0
+    for mtime, size, path in snapshots:
+        total += size
+        if total > CACHE_MAX_BYTES or now - mtime > CACHE_MAX_AGE:
+            for stale in (path, path[:-len(".parquet")] + ".meta.json"):
+                try:
+                    os.remove(stale)
+                except OSError:
+                    pass
+
+
+def _write_disk_cache(df, response, parquet_path, meta_path):
+    """
+    Save a parsed file as Parquet along with the validators of the response
+    it came from, so the next request can be made conditional.
+    """
+    meta = {"etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified")}
+    if not any(meta.values()):
+        return
+    temp_paths = []
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        # Each write gets its own temporary files, so workers caching the same
+        # URL at once never write into one file; os.replace then swaps whole files
+        fd, parquet_tmp = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+        os.close(fd)
+        temp_paths.append(parquet_tmp)
+        df.to_parquet(parquet_tmp, compression="zstd")
+        # Tie the validators to this snapshot; os.replace keeps its inode
+        meta["snapshot"] = _snapshot_id(parquet_tmp)
+        fd, meta_tmp = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+        temp_paths.append(meta_tmp)
+        with os.fdopen(fd, "w") as f:
+            json.dump(meta, f)
+        os.replace(parquet_tmp, parquet_path)
+        os.replace(meta_tmp, meta_path)
+    except Exception as e:
+        print(f"Error caching file: {e}")
+        for path in temp_paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+    _prune_disk_cache()
+
+
+@cached(_FILE_CACHE, lock=_FILE_LOCK)
+def load_file(file_url):
+    """
+    Download an L2 file and parse it into a DataFrame sorted by time.
+    Returns the DataFrame and the name of its timestamp column.
+    """
+    # Ask the server to skip the body if our Parquet snapshot is still current
+    parquet_path, meta_path = _disk_cache_paths(file_url)
+    headers = {}
+    meta = _read_cache_meta(meta_path)
+    if meta and _snapshot_matches(meta, parquet_path):
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    response = SESSION.get(file_url, headers=headers, timeout=FILE_TIMEOUT)
+    if response.status_code == 304:
+        df = _read_disk_cache(parquet_path, meta_path)
+        if df is not None:
+            return df, df.index.name
+        # The snapshot is unusable, so fetch the body unconditionally
+        response = SESSION.get(file_url, timeout=FILE_TIMEOUT)
+    response.raise_for_status()
+    raw = response.content
+
+    # Find the first data row (starting with a timestamp) with a single byte
+    # search instead of splitting the file into lines
+    header_end = raw.find(b"\n202")
+    if header_end < 0:
+        raise InvalidFileError("No valid data found in the file.")
+    data = memoryview(raw)[header_end + 1:]  # No copy of the data section
+
+    # Detect column names section
+    column_names = list(extract_column_names(raw[:header_end]))
+
+    # Adjust column names to match the field count of the first data row
+    line_end = raw.find(b"\n", header_end + 1)
+    first_row = raw[header_end + 1:line_end if line_end >= 0 else len(raw)]
+    actual_field_count = len(first_row.split())
+    if len(column_names) < actual_field_count:
+        column_names.extend([f"Unnamed_{i}" for i in range(len(column_names), actual_field_count)])
+
+    # Dynamically identify the timestamp column
+    timestamp_column = find_timestamp_column(column_names)
+    if not timestamp_column:
+        raise InvalidFileError("No valid timestamp column found in the file.")
+
+    # Create DataFrame
+    df = read_data_section(data, column_names, timestamp_column, first_row)
+
+    # Convert timestamp column to datetime
+    df[timestamp_column] = parse_timestamps(df[timestamp_column])
+    if df[timestamp_column].hasnans:
+        df = df[df[timestamp_column].notna()]
+
+    # A sorted DatetimeIndex lets chart callbacks slice date ranges without copying
+    df = df.set_index(timestamp_column)
+
+    # L2 files are written in time order, so sorting and de-duplicating are
+    # only done when the cheap monotonic / uniqueness checks fail
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index(kind="mergesort")  # Stable, so the first duplicate stays first
+    if not df.index.is_unique:
+        df = df[~df.index.duplicated(keep="first")]
+
+    _write_disk_cache(df, response, parquet_path, meta_path)
+    return df, timestamp_column
+
+
+def lttb(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling of a line to n_out points.
+    Keeps the first and last points and, from each bucket in between, the
+    point forming the largest triangle with its neighbours. Returns the
+    indices of the kept points.
+    """
+    n = len(x)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        # Average of the next bucket (or the last point) is the third vertex
+        next_stop = edges[i + 2] if i + 2 < len(edges) else n
+        cx = x[stop:next_stop].mean()
+        cy = y[stop:next_stop].mean()
+        area = np.abs((x[a] - cx) * (y[start:stop] - y[a]) - (x[a] - x[start:stop]) * (cy - y[a]))
+        a = start + int(area.argmax())
+        keep[i + 1] = a
+    return keep
+
+
+def line_chart(view, column, title, uirevision):
+    """
+    Line chart of one column against the time index, downsampled for plotting.
+    uirevision identifies the series, so zoom is kept only while it stays the same.
+    """
+    series = view[column].dropna()
+    x = series.index.to_numpy()
+    y = series.to_numpy(dtype=np.float64)
+    if len(series) > MAX_CHART_POINTS:
+        # Float seconds are only used to pick points; the original timestamps are plotted
+        keep = lttb(x.astype("datetime64[ns]").view("i8") / 1e9, y, MAX_CHART_POINTS)
+        x, y = x[keep], y[keep]
+    # Build the trace directly from arrays; Scattergl renders with WebGL
+    fig = go.Figure(go.Scattergl(x=x, y=y, mode="lines", name=column))
+    # Re-renders of the same series keep the user's zoom and pan
+    fig.update_layout(title=title, xaxis_title=view.index.name, yaxis_title=column, uirevision=uirevision)
+    return fig
+
+
+def empty_chart():
+    return go.Figure(layout={"title": "No Data Available"})
+
 
 @app.callback(
     [
         Output("line-chart-column-dropdown1", "options"),
         Output("line-chart-column-dropdown2", "options"),
         Output("output-content", "children"),
+        Output("file-store", "data"),
     ],
     Input("file-dropdown", "value")
 )
 def process_selected_file(file_url):
-    global uploaded_df, timestamp_column
-
     if file_url:
         try:
-            response = requests.get(file_url)
-            response.raise_for_status()
-            data = response.content.decode("utf-8", errors="ignore").splitlines()
-
-            # Detect column names section
-            column_names = extract_column_names(data)
-
-            # Detect the data section
-            for i, line in enumerate(data):
-                if line.strip().startswith("202"):  # Detect data rows (starting with a timestamp)
-                    data_section = "\n".join(data[i:])
-                    break
-            else:
-                return [], [], "No valid data found in the file."
-
-            # Count the number of fields in the first data row
-            sample_row = data_section.splitlines()[0]
-            actual_field_count = len(sample_row.split())
-
-            # Adjust column names to match the actual field count
-            if len(column_names) < actual_field_count:
-                column_names.extend([f"Unnamed_{i}" for i in range(len(column_names), actual_field_count)])
-
-            # Create DataFrame
-            df = pd.read_csv(
-                io.StringIO(data_section),
-                delim_whitespace=True,
-                names=column_names,
-                on_bad_lines="skip",  # Skip problematic lines
-            )
-
-            # Dynamically identify the timestamp column
-            possible_timestamp_columns = ["Timestamp", "UT date and time for measurement center"]
-            timestamp_column = next((col for col in column_names if col in possible_timestamp_columns), None)
-            if not timestamp_column:
-                return [], [], "No valid timestamp column found in the file."
-
-            # Convert timestamp column to datetime
-            df[timestamp_column] = pd.to_datetime(df[timestamp_column], format="%Y%m%dT%H%M%S.%fZ", errors="coerce")
-            df.drop_duplicates(subset=[timestamp_column], inplace=True)
-            df.sort_values(by=timestamp_column, inplace=True)
-
-            # Store DataFrame globally for chart callbacks
-            uploaded_df = df
-
-            numeric_columns = [{"label": col, "value": col} for col in column_names if col != timestamp_column]
-            return numeric_columns, numeric_columns, f"Loaded file: {file_url}"
+            df, _ = load_file(file_url)
+            numeric_columns = [{"label": col, "value": col} for col in df.columns]
+            return numeric_columns, numeric_columns, f"Loaded file: {file_url}", file_url
+        except InvalidFileError as e:
+            return [], [], str(e), None
         except Exception as e:
-            return [], [], f"Error loading file: {e}"
-    return [], [], "No file selected."
-
+            return [], [], f"Error loading file: {e}", None
+    return [], [], "No file selected.", None
 
 
 
@@ -206,37 +721,61 @@ def process_selected_file(file_url):
         Input("line-chart-column-dropdown2", "value"),
         Input("date-picker-range", "start_date"),
         Input("date-picker-range", "end_date"),
+        Input("file-store", "data"),
     ],
+    prevent_initial_call=True,
 )
-def update_charts(column1, column2, start_date, end_date):
-    global uploaded_df, timestamp_column
-
-    # Check if uploaded_df is initialized
-    if uploaded_df.empty or not timestamp_column:
-        return px.line(title="No Data Available"), px.line(title="No Data Available")
-
-    df = uploaded_df.copy()
-
-    # Filter by date range if specified
-    if start_date and end_date:
-        df = df[(df[timestamp_column] >= pd.to_datetime(start_date)) & (df[timestamp_column] <= pd.to_datetime(end_date))]
+def update_charts(column1, column2, start_date, end_date, file_url):
+    # Check if a file has been loaded in this session
+    if not file_url:
+        return empty_chart(), empty_chart()
+    try:
+        df, _ = load_file(file_url)
+    except Exception as e:
+        print(f"Error loading file: {e}")
+        return empty_chart(), empty_chart()
+
+    # Ignore selections left over from a previously loaded file
+    column1 = column1 if column1 in df.columns else None
+    column2 = column2 if column2 in df.columns else None
+
+    # A column dropdown only affects its own chart; dates and file changes affect both
+    # Several inputs can fire in one request, so look at all of them
+    changed = set(dash.ctx.triggered_prop_ids.values())
+    update1 = changed != {"line-chart-column-dropdown2"}
+    update2 = changed != {"line-chart-column-dropdown1"}
+
+    wanted = [col for col, update in ((column1, update1), (column2, update2)) if col and update]
+    columns = list(dict.fromkeys(wanted))
+    if columns:
+        # Slice the date range on the sorted index instead of copying and masking
+        start = pd.to_datetime(start_date) if start_date else None
+        end = pd.to_datetime(end_date) if end_date else None
+        view = df.loc[start:end, columns]
 
     # Create the first chart
-    if column1:
-        fig1 = px.line(df, x=timestamp_column, y=column1, title=f"Chart 1: {column1} Over Time")
+    if not update1:
+        fig1 = dash.no_update
+    elif column1:
+        fig1 = line_chart(
+            view, column1, f"Chart 1: {column1} Over Time", f"{file_url}|{column1}|{start_date}|{end_date}"
+        )
     else:
-        fig1 = px.line(title="No Data Available")
+        fig1 = empty_chart()
 
     # Create the second chart
-    if column2:
-        fig2 = px.line(df, x=timestamp_column, y=column2, title=f"Chart 2: {column2} Over Time")
+    if not update2:
+        fig2 = dash.no_update
+    elif column2:
+        fig2 = line_chart(
+            view, column2, f"Chart 2: {column2} Over Time", f"{file_url}|{column2}|{start_date}|{end_date}"
+        )
     else:
-        fig2 = px.line(title="No Data Available")
+        fig2 = empty_chart()
 
     return fig1, fig2
 
 
 
 if __name__ == "__main__":
-    uploaded_df = pd.DataFrame()  # Initialize an empty DataFrame for global use
     app.run_server(debug=True)